@@ -1,3 +1,6 @@
+from collections import OrderedDict
+from weakref import WeakValueDictionary
+
 import numpy as np
 
 from .base import Prior, PriorException
@@ -7,9 +10,41 @@ from .analytical import DeltaFunction, PowerLaw, Uniform, LogUniform, \
     LogNormal, Exponential, StudentT, Beta, Logistic, Cauchy, Gamma, ChiSquared, FermiDirac
 from ..utils import infer_args_from_method, infer_parameters_from_function
 
+# Types of required variables which are compared to skip repeated updates
+_SCALAR_TYPES = frozenset([int, float, np.float64, np.float32, np.int64, np.int32])
+
+
+class _ReferenceParams(dict):
+    """ Dictionary of reference parameters which can be weakly referenced. """
+
+
+_interned_reference_params = WeakValueDictionary()
+
+
+def _intern_reference_params(reference_params):
+    """
+    Return a dictionary equal to `reference_params`, shared with any other
+    conditional prior that has identical (hashable) reference parameters.
+    The reference parameters are only exposed as a copy, so they are safe to
+    share.
+    """
+    try:
+        key = frozenset((name, type(value), value) for name, value in reference_params.items())
+    except TypeError:
+        return reference_params
+    interned = _interned_reference_params.get(key)
+    if interned is None:
+        interned = _ReferenceParams(reference_params)
+        _interned_reference_params[key] = interned
+    return interned
+
 
 def conditional_prior_factory(prior_class):
     class ConditionalPrior(prior_class):
+        # Number of outputs of the condition function to cache, this is only
+        # worthwhile for expensive condition functions with repeated inputs
+        condition_func_cache_size = 0
+
         def __init__(self, condition_func, name=None, latex_label=None, unit=None,
                      boundary=None, **reference_params):
             """
@@ -57,7 +92,7 @@ def conditional_prior_factory(prior_class):
 
             self._required_variables = None
             self.condition_func = condition_func
-            self._reference_params = reference_params
+            self._reference_params = _intern_reference_params(reference_params)
             self.__class__.__name__ = 'Conditional{}'.format(prior_class.__name__)
             self.__class__.__qualname__ = 'Conditional{}'.format(prior_class.__qualname__)
 
@@ -155,7 +190,11 @@ def conditional_prior_factory(prior_class):
             this could be e.g. `minimum`, `maximum`, `mu`, `sigma`, etc.) of this prior
             class depending on the required variables it depends on.
 
-            If no variables are given, the most recently used conditional parameters are kept
+            If no variables are given, the most recently used conditional parameters are kept.
+            If the (scalar) variables are the same as in the previous call, the
+            condition function is not evaluated again. If `condition_func_cache_size`
+            is positive, the outputs of the condition function for that many of the most
+            recent sets of scalar variables are cached.
 
             Parameters
             ==========
@@ -164,10 +203,20 @@ def conditional_prior_factory(prior_class):
                 self.reference_params will be used.
 
             """
-            if sorted(list(required_variables)) == sorted(self.required_variables):
-                parameters = self.condition_func(self.reference_params.copy(), **required_variables)
+            if required_variables.keys() == set(self.required_variables):
+                if _SCALAR_TYPES.issuperset(map(type, required_variables.values())):
+                    if required_variables == self._last_required_variables:
+                        return
+                    last_required_variables = required_variables
+                else:
+                    last_required_variables = None
+                if last_required_variables is not None and self.condition_func_cache_size > 0:
+                    parameters = self._cached_condition_func(tuple(sorted(required_variables.items())))
+                else:
+                    parameters = self.condition_func(self._reference_params.copy(), **required_variables)
                 for key, value in parameters.items():
                     setattr(self, key, value)
+                self._last_required_variables = last_required_variables
             elif len(required_variables) == 0:
                 return
             else:
@@ -175,14 +224,30 @@ def conditional_prior_factory(prior_class):
                                                         .format(self.required_variables,
                                                                 list(required_variables.keys())))
 
+        def _cached_condition_func(self, required_kwargs):
+            """
+            Evaluate the condition function for a sorted tuple of (scalar)
+            keyword arguments, reusing the output for recently seen arguments.
+            """
+            cache = self._condition_func_cache
+            if required_kwargs in cache:
+                cache.move_to_end(required_kwargs)
+                return cache[required_kwargs]
+            parameters = self.condition_func(self._reference_params.copy(), **dict(required_kwargs))
+            cache[required_kwargs] = parameters
+            if len(cache) > self.condition_func_cache_size:
+                cache.popitem(last=False)
+            return parameters
+
         @property
         def reference_params(self):
             """
             Initial values for attributes such as `minimum`, `maximum`.
             This depends on the `prior_class`, for example for the Gaussian
-            prior this is `mu` and `sigma`. This is read-only.
+            prior this is `mu` and `sigma`. This is a copy, as the
+            reference parameters may be shared with other priors.
             """
-            return self._reference_params
+            return dict(self._reference_params)
 
         @property
         def condition_func(self):
@@ -195,6 +260,8 @@ def conditional_prior_factory(prior_class):
             else:
                 self._condition_func = condition_func
             self._required_variables = infer_parameters_from_function(self.condition_func)
+            self._last_required_variables = None
+            self._condition_func_cache = OrderedDict()
 
         @property
         def required_variables(self):
@@ -203,7 +270,7 @@ def conditional_prior_factory(prior_class):
 
         def get_instantiation_dict(self):
             instantiation_dict = super(ConditionalPrior, self).get_instantiation_dict()
-            for key, value in self.reference_params.items():
+            for key, value in self._reference_params.items():
                 instantiation_dict[key] = value
             return instantiation_dict
 
@@ -211,8 +278,9 @@ def conditional_prior_factory(prior_class):
             """
             Reset the object attributes to match the original reference parameters
             """
-            for key, value in self.reference_params.items():
+            for key, value in self._reference_params.items():
                 setattr(self, key, value)
+            self._last_required_variables = None
 
         def __repr__(self):
             """Overrides the special method __repr__.
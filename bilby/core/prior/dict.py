@@ -1,6 +1,7 @@
 import json
 import os
 import re
+from concurrent.futures import ThreadPoolExecutor
 from importlib import import_module
 from io import open as ioopen
 
@@ -597,14 +598,20 @@ class PriorDict(dict):
         keys: list
             List of prior keys to be rescaled
         theta: list
-            List of randomly drawn values on a unit cube associated with the prior keys
+            List of randomly drawn values on a unit cube associated with the prior keys.
+            This can also be an array with shape `(len(keys), nsamples)`.
 
         Returns
         =======
-        list: List of floats containing the rescaled sample
+        list: List of floats containing the rescaled sample. If `theta` is a
+        two-dimensional array, an array with the same shape is returned.
         """
         from matplotlib.cbook import flatten
 
+        if isinstance(theta, np.ndarray) and theta.ndim == 2:
+            return np.array(
+                [self[key].rescale(sample) for key, sample in zip(keys, theta)]
+            )
         return list(
             flatten([self[key].rescale(sample) for key, sample in zip(keys, theta)])
         )
@@ -649,7 +656,16 @@ class PriorDictException(Exception):
 
 
 class ConditionalPriorDict(PriorDict):
-    def __init__(self, dictionary=None, filename=None, conversion_function=None):
+    # Minimum number of samples to rescale the unconditional priors in threads
+    _threaded_sample_size = 10000
+
+    def __init__(
+        self,
+        dictionary=None,
+        filename=None,
+        conversion_function=None,
+        vectorized_rescale=None,
+    ):
         """
 
         Parameters
@@ -658,12 +674,27 @@ class ConditionalPriorDict(PriorDict):
             See parent class
         filename: str
             See parent class
+        conversion_function: func
+            See parent class
+        vectorized_rescale: func
+            Function with the same arguments and output as `rescale`, which is
+            called instead of rescaling each prior in turn. This can be used
+            when the chain of conditions has a closed form, e.g., for priors
+            where each parameter is uniform between zero and the previous
+            parameter the rescaled values are `np.cumprod(theta)`. The
+            `least_recently_sampled` attributes of the priors are not updated.
+            Default is to rescale each prior in turn.
         """
+        self.vectorized_rescale = vectorized_rescale
         self._conditional_keys = []
         self._unconditional_keys = []
         self._rescale_keys = []
         self._rescale_indexes = []
         self._least_recently_rescaled_keys = []
+        self._version = 0
+        self._sorted_keys_cache = (-1, [])
+        self._sorted_keys_without_fixed_parameters_cache = (-1, [])
+        self._rescale_plan_cache = (-1, [])
         super(ConditionalPriorDict, self).__init__(
             dictionary=dictionary,
             filename=filename,
@@ -683,7 +714,12 @@ class ConditionalPriorDict(PriorDict):
         all conditional priors will be sorted in order
         4. We set the `self._resolved` flag to True if all conditional
         priors were added in the right order
+
+        The version counter is incremented so that the cached key orders
+        are recomputed on the next access.
         """
+        # Items are set before the attributes when unpickling
+        self._version = getattr(self, "_version", 0) + 1
         self._unconditional_keys = [
             key for key in self.keys() if not hasattr(self[key], "condition_func")
         ]
@@ -691,10 +727,12 @@ class ConditionalPriorDict(PriorDict):
             key for key in self.keys() if hasattr(self[key], "condition_func")
         ]
         self._conditional_keys = []
+        sampled_keys = set(self._unconditional_keys)
         for _ in range(len(self)):
             for key in conditional_keys_unsorted[:]:
-                if self._check_conditions_resolved(key, self.sorted_keys):
+                if self._check_conditions_resolved(key, sampled_keys):
                     self._conditional_keys.append(key)
+                    sampled_keys.add(key)
                     conditional_keys_unsorted.remove(key)
 
         self._resolved = True
@@ -716,9 +754,11 @@ class ConditionalPriorDict(PriorDict):
             raise IllegalConditionsException(
                 "The current set of priors contains unresolvable conditions."
             )
-        samples = dict()
+        samples = self._sample_unconditional_keys(
+            keys=subset_dict.unconditional_keys, size=size
+        )
         for key in subset_dict.sorted_keys:
-            if isinstance(self[key], Constraint):
+            if key in samples or isinstance(self[key], Constraint):
                 continue
             elif isinstance(self[key], Prior):
                 try:
@@ -739,6 +779,46 @@ class ConditionalPriorDict(PriorDict):
                 logger.debug("{} not a known prior.".format(key))
         return samples
 
+    def _sample_unconditional_keys(self, keys, size=None):
+        """
+        Sample all of the unconditional priors at once for large sample sizes.
+
+        The unit cube values are drawn in a single call in the same order as
+        sampling each prior in turn and the rescaling is run in a thread pool.
+        This is only done if all of the priors use `Prior.sample`, otherwise
+        an empty dictionary is returned and the priors are sampled in turn.
+
+        Parameters
+        ==========
+        keys: list
+            The unconditional keys to sample, in sampling order
+        size: int or tuple of ints, optional
+            See numpy.random.uniform docs
+
+        Returns
+        =======
+        dict: Dictionary of the samples of the unconditional priors
+        """
+        keys = [key for key in keys if not isinstance(self[key], Constraint)]
+        if (
+            size is None
+            or np.prod(size) < self._threaded_sample_size
+            or len(keys) < 2
+            or any(
+                getattr(type(self[key]), "sample", None) is not Prior.sample
+                for key in keys
+            )
+        ):
+            return dict()
+
+        def _rescale(key, values):
+            self[key].least_recently_sampled = self[key].rescale(values)
+            return self[key].least_recently_sampled
+
+        unit_samples = np.random.uniform(0, 1, (len(keys),) + tuple(np.atleast_1d(size)))
+        with ThreadPoolExecutor(max_workers=min(8, len(keys))) as executor:
+            return dict(zip(keys, executor.map(_rescale, keys, unit_samples)))
+
     def get_required_variables(self, key):
         """Returns the required variables to sample a given conditional key.
 
@@ -818,35 +898,67 @@ class ConditionalPriorDict(PriorDict):
         keys: list
             List of prior keys to be rescaled
         theta: list
-            List of randomly drawn values on a unit cube associated with the prior keys
+            List of randomly drawn values on a unit cube associated with the prior keys.
+            This can also be an array with shape `(len(keys), nsamples)`.
 
         Returns
         =======
-        list: List of floats containing the rescaled sample
+        list: List of floats containing the rescaled sample. If `theta` is a
+        two-dimensional array, an array with the same shape is returned.
         """
         from matplotlib.cbook import flatten
 
+        if self.vectorized_rescale is not None:
+            self._check_resolved()
+            return self.vectorized_rescale(keys, theta)
+        vectorized = isinstance(theta, np.ndarray) and theta.ndim == 2
         keys = list(keys)
         theta = list(theta)
         self._check_resolved()
         self._update_rescale_keys(keys)
         result = dict()
-        for key, index in zip(
-            self.sorted_keys_without_fixed_parameters, self._rescale_indexes
+        for (key, prior, required), index in zip(
+            self._rescale_plan, self._rescale_indexes
         ):
-            result[key] = self[key].rescale(
-                theta[index], **self.get_required_variables(key)
+            result[key] = prior.rescale(
+                theta[index],
+                **{name: other.least_recently_sampled for name, other in required},
             )
-            self[key].least_recently_sampled = result[key]
+            prior.least_recently_sampled = result[key]
+        if vectorized:
+            return np.array([result[key] for key in keys])
         return list(flatten([result[key] for key in keys]))
 
     def _update_rescale_keys(self, keys):
-        if not keys == self._least_recently_rescaled_keys:
+        if not (self._version, keys) == self._least_recently_rescaled_keys:
             self._rescale_indexes = [
                 keys.index(element)
                 for element in self.sorted_keys_without_fixed_parameters
             ]
-            self._least_recently_rescaled_keys = keys
+            self._least_recently_rescaled_keys = (self._version, keys)
+
+    @property
+    def _rescale_plan(self):
+        """
+        The priors in the order they are rescaled, along with the names and
+        priors of their required variables. This is cached until the next
+        time an item is set or deleted.
+        """
+        version, plan = self._rescale_plan_cache
+        if version != self._version:
+            plan = [
+                (
+                    key,
+                    self[key],
+                    tuple(
+                        (name, self[name])
+                        for name in getattr(self[key], "required_variables", [])
+                    ),
+                )
+                for key in self.sorted_keys_without_fixed_parameters
+            ]
+            self._rescale_plan_cache = (self._version, plan)
+        return plan
 
     def _prepare_evaluation(self, keys, theta):
         self._check_resolved()
@@ -869,24 +981,48 @@ class ConditionalPriorDict(PriorDict):
 
     @property
     def sorted_keys(self):
-        return self.unconditional_keys + self.conditional_keys
+        """
+        The keys in an order in which they can be sampled. This is cached
+        until the next time an item is set or deleted.
+        """
+        version, keys = self._sorted_keys_cache
+        if version != self._version:
+            keys = self.unconditional_keys + self.conditional_keys
+            self._sorted_keys_cache = (self._version, keys)
+        return keys
 
     @property
     def sorted_keys_without_fixed_parameters(self):
-        return [
-            key
-            for key in self.sorted_keys
-            if not isinstance(self[key], (DeltaFunction, Constraint))
-        ]
+        version, keys = self._sorted_keys_without_fixed_parameters_cache
+        if version != self._version:
+            keys = [
+                key
+                for key in self.sorted_keys
+                if not isinstance(self[key], (DeltaFunction, Constraint))
+            ]
+            self._sorted_keys_without_fixed_parameters_cache = (self._version, keys)
+        return keys
 
     def __setitem__(self, key, value):
         super(ConditionalPriorDict, self).__setitem__(key, value)
         self._resolve_conditions()
 
+    def update(self, *args, **kwargs):
+        super(ConditionalPriorDict, self).update(*args, **kwargs)
+        self._resolve_conditions()
+
     def __delitem__(self, key):
         super(ConditionalPriorDict, self).__delitem__(key)
         self._resolve_conditions()
 
+    def copy(self):
+        """
+        We have to overwrite the copy method to keep the `vectorized_rescale`.
+        """
+        new = super(ConditionalPriorDict, self).copy()
+        new.vectorized_rescale = self.vectorized_rescale
+        return new
+
 
 class DirichletPriorDict(ConditionalPriorDict):
     def __init__(self, n_dim=None, label="dirichlet_"):
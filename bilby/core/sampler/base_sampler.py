@@ -203,6 +203,10 @@ class Sampler(object):
     If a specific sampler does not have a sampling seed option, then it should be
     left as None.
     """
+    _skip_likelihood_timing = False
+    """If True, the likelihood is not timed on initialisation, e.g., because
+    the evaluation time will be read from a resume file.
+    """
 
     def __init__(
         self,
@@ -249,7 +253,10 @@ class Sampler(object):
 
         if not soft_init:
             self._verify_parameters()
-            self._time_likelihood()
+            if self._skip_likelihood_timing:
+                self._log_likelihood_eval_time = np.nan
+            else:
+                self._time_likelihood()
             self._verify_use_ratio()
 
         self.kwargs = kwargs
@@ -1,10 +1,240 @@
 import datetime
+import math
+import os
+import sys
+import time
+import uuid
+from collections import OrderedDict
+from functools import partial
 
 import numpy as np
 
 from ..utils import logger
 from .base_sampler import Sampler, signal_wrapper
-from .dynesty import Dynesty, _log_likelihood_wrapper, _prior_transform_wrapper
+from .dynesty import (
+    Dynesty,
+    _log_likelihood_wrapper,
+    _log_likelihood_wrapper_batch,
+    _prior_transform_wrapper,
+    _prior_transform_wrapper_batch,
+)
+
+
+_log_likelihood_cache = OrderedDict()
+_log_likelihood_cache_size = 2**16
+
+
+def _significant_figures_key(theta, significant_figures):
+    """
+    A hashable key for the parameters rounded to a number of significant
+    figures, so the rounding is relative to the scale of each parameter.
+    """
+    theta = np.asarray(theta, dtype=np.float64)
+    with np.errstate(divide="ignore"):
+        exponent = np.floor(np.log10(np.abs(theta)))
+    exponent[~np.isfinite(exponent)] = 0
+    mantissa = np.round(theta / 10**exponent, significant_figures - 1)
+    return tuple(mantissa) + tuple(exponent)
+
+
+def _cached_log_likelihood_wrapper(theta, significant_figures, cache_id):
+    """
+    Wrapper to the log likelihood with a per-process cache. The rounded
+    parameters are only used as the cache key, the likelihood is always
+    evaluated at the original parameters. The `cache_id` identifies the run,
+    so values cached by a previous run in the same process (e.g., a
+    persistent pool) are not reused. Needed for multiprocessing.
+    """
+    key = (cache_id,) + _significant_figures_key(theta, significant_figures)
+    if key in _log_likelihood_cache:
+        _log_likelihood_cache.move_to_end(key)
+        return _log_likelihood_cache[key]
+    value = _log_likelihood_wrapper(theta)
+    _log_likelihood_cache[key] = value
+    if len(_log_likelihood_cache) > _log_likelihood_cache_size:
+        _log_likelihood_cache.popitem(last=False)
+    return value
+
+
+def _none_to_maxsize(value):
+    """Convert a `None` limit to `sys.maxsize`, as done by dynesty."""
+    if value is None:
+        return sys.maxsize
+    return value
+
+
+def _reduced_precision_update(update, dtype):
+    """
+    Wrap :code:`dynesty.bounding.MultiEllipsoid.update` so that the ellipsoids
+    are fit to a copy of the points with the given dtype. The ellipsoids are
+    cast back to double precision afterwards.
+    """
+
+    def wrapped(self, points, *args, **kwargs):
+        update(self, np.asarray(points, dtype=dtype), *args, **kwargs)
+        _restore_double_precision(self, np.asarray(points, dtype=np.float64))
+
+    wrapped.original = update
+    return wrapped
+
+
+def _restore_double_precision(multi_ellipsoid, points):
+    """
+    Cast a set of ellipsoids back to double precision and expand them if any
+    of the points are not enclosed at double precision.
+    """
+
+    def _collect():
+        ells = multi_ellipsoid.ells
+        multi_ellipsoid.ctrs = np.array([ell.ctr for ell in ells])
+        multi_ellipsoid.covs = np.array([ell.cov for ell in ells])
+        multi_ellipsoid.ams = np.array([ell.am for ell in ells])
+        multi_ellipsoid.vols = np.array([ell.vol for ell in ells])
+        multi_ellipsoid.vol_tot = sum(multi_ellipsoid.vols)
+
+    for ell in multi_ellipsoid.ells:
+        for key in ["ctr", "cov", "am", "axes", "axlens", "paxes"]:
+            setattr(ell, key, np.asarray(getattr(ell, key), dtype=np.float64))
+        ell.vol = float(ell.vol)
+    _collect()
+
+    delta = points[:, np.newaxis, :] - multi_ellipsoid.ctrs
+    distance = np.einsum("pei,eij,pej->pe", delta, multi_ellipsoid.ams, delta)
+    max_distance = distance.min(axis=1).max()
+    if max_distance > 1:
+        ndim = points.shape[1]
+        multi_ellipsoid.scale_to_vols(multi_ellipsoid.vols * max_distance ** (ndim / 2))
+        _collect()
+
+
+def _set_bound_dtype(dtype):
+    """
+    Set the dtype used to fit the multi-ellipsoid bounds in dynesty.
+    If `dtype` is None the original dynesty method is restored.
+    """
+    from dynesty.bounding import MultiEllipsoid
+
+    update = getattr(MultiEllipsoid.update, "original", MultiEllipsoid.update)
+    if dtype is None or np.dtype(dtype) == np.float64:
+        MultiEllipsoid.update = update
+    else:
+        MultiEllipsoid.update = _reduced_precision_update(update, dtype)
+
+
+def _pack_saved_runs(sampler):
+    """
+    Replace the per-iteration lists of the saved, base and new runs of a
+    dynesty sampler by contiguous arrays so they are pickled as a single
+    buffer rather than one object per entry.
+
+    Returns
+    =======
+    dict: The original lists, to be restored after pickling.
+    """
+    original = dict()
+    for key, value in vars(sampler).items():
+        if not key.startswith(("saved_", "base_", "new_")):
+            continue
+        if not isinstance(value, list) or len(value) == 0:
+            continue
+        if not isinstance(value[0], (np.ndarray, int, float, np.number)):
+            continue
+        try:
+            array = np.asarray(value)
+        except ValueError:
+            continue
+        if array.dtype == object:
+            continue
+        original[key] = value
+    for key, value in original.items():
+        setattr(sampler, key, np.asarray(value))
+    sampler.packed_run_keys = list(original)
+    return original
+
+
+def _unpack_saved_runs(sampler):
+    """
+    Convert the arrays written by `_pack_saved_runs` back to the lists
+    dynesty appends to.
+    """
+    for key in getattr(sampler, "packed_run_keys", list()):
+        array = getattr(sampler, key)
+        if array.ndim == 1:
+            setattr(sampler, key, array.tolist())
+        else:
+            setattr(sampler, key, list(array))
+    sampler.packed_run_keys = list()
+
+
+class BatchPool(object):
+    """
+    Pool-like object passed to dynesty which evaluates batches of
+    log-likelihood and/or prior transform calls with a single vectorized call.
+
+    When dynesty maps a vectorized function over a set of points, the points
+    are copied into a contiguous `(nbatch, ndim)` array and passed to
+    `_log_likelihood_wrapper_batch` or `_prior_transform_wrapper_batch`. All
+    other functions are mapped with the underlying pool, or the builtin `map`
+    if there is no pool. If a function can not be vectorized, the scalar path
+    is used for that function from then on.
+
+    Parameters
+    ==========
+    pool: multiprocessing.Pool, optional
+        The pool to use for all non-vectorized calls.
+    size: int
+        The number of points to propose in parallel, used by dynesty as the
+        `queue_size`.
+    likelihood: bool
+        Whether to evaluate the log likelihood in batches.
+    prior_transform: bool
+        Whether to evaluate the prior transform in batches.
+    """
+
+    def __init__(self, pool=None, size=1, likelihood=True, prior_transform=False):
+        self.pool = pool
+        self.size = size
+        self.vectorized = dict(
+            loglikelihood=likelihood, prior_transform=prior_transform
+        )
+
+    @staticmethod
+    def _evaluate_batch(name, theta):
+        if name == "loglikelihood":
+            return list(_log_likelihood_wrapper_batch(theta))
+        else:
+            return list(_prior_transform_wrapper_batch(theta))
+
+    def map(self, func, iterable):
+        name = getattr(func, "name", None)
+        if self.vectorized.get(name, False):
+            points = list(iterable)
+            if len(points) == 0:
+                return list()
+            theta = np.empty((len(points), len(points[0])), dtype=np.float64)
+            for ii, point in enumerate(points):
+                theta[ii] = point
+            try:
+                return self._evaluate_batch(name, theta)
+            except (TypeError, ValueError, IndexError) as e:
+                logger.warning(
+                    f"Unable to evaluate the {name} in batches ({e}), "
+                    "falling back to scalar evaluation."
+                )
+                self.vectorized[name] = False
+            iterable = points
+        if self.pool is None:
+            return map(func, iterable)
+        else:
+            return self.pool.map(func, iterable)
+
+    def close(self):
+        if self.pool is not None:
+            self.pool.close()
+
+    def join(self):
+        if self.pool is not None:
+            self.pool.join()
 
 
 class DynamicDynesty(Dynesty):
@@ -55,10 +285,41 @@ class DynamicDynesty(Dynesty):
         interrupted, it can be resumed from the last checkpoint. Set to
         `None` to turn-off check pointing
     n_check_point: int, optional (None)
-        The number of steps to take before check pointing (override
-        check_point_delta_t).
+        The number of likelihood calls between check points. If given, this
+        overrides `check_point_delta_t` and the resume file is written every
+        `n_check_point_flush` check points. If not given, it is estimated from
+        `check_point_delta_t` and the likelihood evaluation time.
+    n_check_point_flush: int, optional (1)
+        The number of check points between writing the resume file. If
+        `n_check_point` is not given, the file is only written once at least
+        `check_point_delta_t` seconds have also passed since the last write.
     resume: bool
         If true, resume run from checkpoint (if available)
+    cache_significant_figures: int, optional (None)
+        If given, likelihood evaluations are cached and reused for parameters
+        which agree to this number of significant figures. Points which agree
+        to this precision are treated as identical, so this can change the
+        results and should be larger than the resolution the likelihood is
+        sensitive to. By default the cache is not used.
+    vectorized_likelihood: bool, optional (False)
+        If true, batches of points are evaluated with a single call to the
+        likelihood with array-valued parameters, see `BatchPool`. The
+        likelihood must return an array with one value per point.
+    vectorized_prior: bool, optional (False)
+        If true, batches of live points are transformed from the unit cube
+        with a single call to the prior rescale with array-valued inputs,
+        see `BatchPool`.
+    print_method: str ('tqdm')
+        The method to use for printing if `print_func` is not given, see
+        `Dynesty`. The options are:
+        - 'tqdm': use a `tqdm` `pbar`, this is the default.
+        - 'interval-$TIME': print to `stdout` every `$TIME` seconds,
+          e.g., 'interval-10' prints every ten seconds, this does not print every iteration
+        - else: print to `stdout` at every iteration
+    bound_dtype: numpy.dtype, optional (None)
+        If given (e.g., `np.float32`), the multi-ellipsoid bounds are fit to a
+        copy of the live points with this dtype. The ellipsoids are cast back
+        to double precision and expanded to enclose all of the live points.
     """
 
     default_kwargs = dict(
@@ -104,6 +365,34 @@ class DynamicDynesty(Dynesty):
         print_progress=True,
         print_func=None,
         live_points=None,
+        cache_significant_figures=None,
+        vectorized_likelihood=False,
+        vectorized_prior=False,
+        print_method="tqdm",
+        bound_dtype=None,
+    )
+
+    _sampler_function_kwargs_keys = (
+        "nlive_init",
+        "maxiter_init",
+        "maxcall_init",
+        "dlogz_init",
+        "logl_max_init",
+        "nlive_batch",
+        "wt_function",
+        "wt_kwargs",
+        "maxiter_batch",
+        "maxcall_batch",
+        "maxiter",
+        "maxcall",
+        "maxbatch",
+        "stop_function",
+        "stop_kwargs",
+        "use_stop",
+        "save_bounds",
+        "print_progress",
+        "print_func",
+        "live_points",
     )
 
     def __init__(
@@ -118,9 +407,14 @@ class DynamicDynesty(Dynesty):
         check_point=True,
         n_check_point=None,
         check_point_delta_t=600,
+        n_check_point_flush=1,
         resume=True,
         **kwargs,
     ):
+        # The likelihood evaluation time is read from the resume file
+        self._skip_likelihood_timing = (
+            check_point and resume and os.path.isfile(f"{outdir}/{label}_resume.pickle")
+        )
         super(DynamicDynesty, self).__init__(
             likelihood=likelihood,
             priors=priors,
@@ -133,17 +427,34 @@ class DynamicDynesty(Dynesty):
         )
         self.n_check_point = n_check_point
         self.check_point = check_point
+        self.check_point_delta_t = check_point_delta_t
+        self.n_check_point_flush = n_check_point_flush
+        self._n_check_point_given = n_check_point is not None
+        self._n_pending_checkpoints = 0
         self.resume = resume
-        if self.n_check_point is None:
-            # If the log_likelihood_eval_time is not calculable then
-            # check_point is set to False.
-            if np.isnan(self._log_likelihood_eval_time):
-                self.check_point = False
-            n_check_point_raw = check_point_delta_t / self._log_likelihood_eval_time
-            n_check_point_rnd = int(float(f"{n_check_point_raw:1.0g}"))
-            self.n_check_point = n_check_point_rnd
+        if self.n_check_point is None and not self._skip_likelihood_timing:
+            self._set_n_check_point()
 
         self.resume_file = f"{self.outdir}/{self.label}_resume.pickle"
+        self.likelihood_cache = _log_likelihood_cache
+
+    def _set_n_check_point(self):
+        """
+        Set the number of likelihood calls between check points from the
+        likelihood evaluation time and `check_point_delta_t`.
+        """
+        # If the log_likelihood_eval_time is not calculable then
+        # check_point is set to False.
+        if np.isnan(self._log_likelihood_eval_time):
+            self.check_point = False
+        n_check_point_raw = self.check_point_delta_t / self._log_likelihood_eval_time
+        if np.isinf(n_check_point_raw):
+            self.n_check_point = sys.maxsize
+        elif not np.isnan(n_check_point_raw):
+            # Round to one significant figure, with at least one call
+            n_check_point_raw = max(n_check_point_raw, 1)
+            magnitude = 10 ** math.floor(math.log10(n_check_point_raw))
+            self.n_check_point = int(round(n_check_point_raw / magnitude) * magnitude)
 
     @property
     def external_sampler_name(self):
@@ -151,51 +462,45 @@ class DynamicDynesty(Dynesty):
 
     @property
     def sampler_function_kwargs(self):
-        keys = [
-            "nlive_init",
-            "maxiter_init",
-            "maxcall_init",
-            "dlogz_init",
-            "logl_max_init",
-            "nlive_batch",
-            "wt_function",
-            "wt_kwargs",
-            "maxiter_batch",
-            "maxcall_batch",
-            "maxiter",
-            "maxcall",
-            "maxbatch",
-            "stop_function",
-            "stop_kwargs",
-            "use_stop",
-            "save_bounds",
-            "print_progress",
-            "print_func",
-            "live_points",
-        ]
-        return {key: self.kwargs[key] for key in keys}
+        kwargs = self.kwargs
+        return {key: kwargs[key] for key in self._sampler_function_kwargs_keys}
 
     @signal_wrapper
     def run_sampler(self):
         import dynesty
 
+        loglikelihood = self._get_log_likelihood_function()
         self._setup_pool()
-        self.sampler = dynesty.DynamicNestedSampler(
-            loglikelihood=_log_likelihood_wrapper,
-            prior_transform=_prior_transform_wrapper,
-            ndim=self.ndim,
-            **self.sampler_init_kwargs,
-        )
-
-        if self.check_point:
-            out = self._run_external_sampler_with_checkpointing()
-        else:
-            out = self._run_external_sampler_without_checkpointing()
+        if self.kwargs["vectorized_likelihood"] or self.kwargs["vectorized_prior"]:
+            self.pool = BatchPool(
+                pool=self.pool,
+                size=self.kwargs["queue_size"] or 1,
+                likelihood=self.kwargs["vectorized_likelihood"],
+                prior_transform=self.kwargs["vectorized_prior"],
+            )
+            self.kwargs["pool"] = self.pool
+        _set_bound_dtype(self.kwargs["bound_dtype"])
+        try:
+            if not self._maybe_resume():
+                self.sampler = dynesty.DynamicNestedSampler(
+                    loglikelihood=loglikelihood,
+                    prior_transform=_prior_transform_wrapper,
+                    ndim=self.ndim,
+                    **self.sampler_init_kwargs,
+                )
+            self.start_time = datetime.datetime.now()
+            if self.check_point:
+                out = self._run_external_sampler_with_checkpointing()
+            else:
+                out = self._run_external_sampler_without_checkpointing()
+        finally:
+            _set_bound_dtype(None)
         self._close_pool()
+        self._close_pbar()
 
         # Flushes the output to force a line break
-        if self.kwargs["verbose"]:
-            print("")
+        if self.kwargs["verbose"] and sys.stdout.isatty():
+            sys.stdout.write("\n")
 
         # self.result.sampler_output = out
         self._generate_result(out)
@@ -204,31 +509,192 @@ class DynamicDynesty(Dynesty):
 
         return self.result
 
+    def _maybe_resume(self):
+        """
+        Try to restore the sampler from the resume file before a new sampler
+        is constructed. If the likelihood timing was skipped on
+        initialisation, the stored evaluation time is used to set
+        `n_check_point`, or the likelihood is timed if that is not available.
+
+        Returns
+        =======
+        bool: Whether the sampler was restored from the resume file
+        """
+        resumed = False
+        if self.check_point and self.resume:
+            if self.read_saved_state(continuing=True):
+                logger.info("Resuming from previous run.")
+                resumed = True
+        if self._skip_likelihood_timing:
+            self._skip_likelihood_timing = False
+            if np.isnan(self._log_likelihood_eval_time):
+                self._time_likelihood()
+            if self.n_check_point is None:
+                self._set_n_check_point()
+        return resumed
+
+    def _get_log_likelihood_function(self):
+        """
+        Get the log likelihood function to pass to dynesty.
+
+        If `cache_significant_figures` is not `None` this is the cached
+        wrapper. The cache is emptied, this must happen before the pool is
+        set up so that the workers do not inherit it, and the cached values
+        are keyed by a new identifier for this run.
+        """
+        significant_figures = self.kwargs["cache_significant_figures"]
+        if significant_figures is None:
+            return _log_likelihood_wrapper
+        self.likelihood_cache.clear()
+        return partial(
+            _cached_log_likelihood_wrapper,
+            significant_figures=significant_figures,
+            cache_id=uuid.uuid4().hex,
+        )
+
     def _run_external_sampler_with_checkpointing(self):
+        """
+        Run the baseline nested sampling run and then add batches one at a
+        time with :code:`add_batch`, checkpointing between batches.
+
+        Each batch is limited to `n_check_point` likelihood calls. The
+        stopping criteria mirror those of :code:`run_nested`.
+        """
+        from dynesty.dynamicsampler import stopping_function
+
         logger.debug("Running sampler with checkpointing")
-        if self.resume:
-            resume = self.read_saved_state(continuing=True)
-            if resume:
-                logger.info("Resuming from previous run.")
 
-        old_ncall = self.sampler.ncall
-        sampler_kwargs = self.sampler_function_kwargs.copy()
-        sampler_kwargs["maxcall"] = self.n_check_point
-        self.start_time = datetime.datetime.now()
-        while True:
-            sampler_kwargs["maxcall"] += self.n_check_point
-            self.sampler.run_nested(**sampler_kwargs)
-            if self.sampler.ncall == old_ncall:
-                break
-            old_ncall = self.sampler.ncall
+        sampler_kwargs = self.sampler_function_kwargs
+        maxcall = _none_to_maxsize(sampler_kwargs["maxcall"])
+        maxiter = _none_to_maxsize(sampler_kwargs["maxiter"])
+        maxbatch = _none_to_maxsize(sampler_kwargs["maxbatch"])
+        maxcall_batch = _none_to_maxsize(sampler_kwargs["maxcall_batch"])
+        maxiter_batch = _none_to_maxsize(sampler_kwargs["maxiter_batch"])
+        stop_function = sampler_kwargs["stop_function"] or stopping_function
+        stop_kwargs = sampler_kwargs["stop_kwargs"] or dict()
+
+        self._last_checkpoint_time = time.time()
+
+        if not self.sampler.base:
+            self.sampler.run_nested(**dict(sampler_kwargs, maxbatch=0))
+            self._add_pending_checkpoint()
 
-            self.write_current_state()
+        add_batch = partial(
+            self.sampler.add_batch,
+            nlive=sampler_kwargs["nlive_batch"],
+            wt_function=sampler_kwargs["wt_function"],
+            wt_kwargs=sampler_kwargs["wt_kwargs"],
+            save_bounds=sampler_kwargs["save_bounds"],
+            print_progress=sampler_kwargs["print_progress"],
+            print_func=sampler_kwargs["print_func"],
+        )
+        while self.sampler.batch < maxbatch:
+            mcall = min(maxcall - self.sampler.ncall, maxcall_batch, self.n_check_point)
+            miter = min(maxiter - self.sampler.it + 1, maxiter_batch)
+            if mcall <= 0 or miter <= 0:
+                break
+            if sampler_kwargs["use_stop"]:
+                stop, (_, _, stop_val) = stop_function(
+                    self.sampler.results,
+                    stop_kwargs,
+                    rstate=self.sampler.rstate,
+                    M=self.sampler.M if self.sampler.use_pool_stopfn else map,
+                    return_vals=True,
+                )
+                if stop:
+                    break
+            else:
+                stop_val = np.nan
+            add_batch(maxiter=miter, maxcall=mcall, stop_val=stop_val)
+            self._add_pending_checkpoint()
 
+        self._n_pending_checkpoints = 0
         self._remove_checkpoint()
         return self.sampler.results
 
+    def _add_pending_checkpoint(self):
+        """
+        Record a check point and write the resume file if it is due.
+        """
+        self._n_pending_checkpoints += 1
+        if self._check_point_due():
+            self._flush_checkpoints()
+
+    def _check_point_due(self):
+        """
+        Check if enough check points have passed since the last write of the
+        resume file. Unless `n_check_point` was given, `check_point_delta_t`
+        seconds must also have passed.
+        """
+        if self._n_pending_checkpoints < self.n_check_point_flush:
+            return False
+        if self._n_check_point_given:
+            return True
+        elapsed = time.time() - self._last_checkpoint_time
+        return elapsed >= self.check_point_delta_t
+
+    def _flush_checkpoints(self):
+        """
+        Write a single resume file covering all of the pending check points.
+        """
+        if self._n_pending_checkpoints == 0:
+            return
+        logger.debug(
+            f"Writing checkpoint for {self._n_pending_checkpoints} check points"
+        )
+        self.write_current_state()
+        self._last_checkpoint_time = time.time()
+        self._n_pending_checkpoints = 0
+
+    def write_current_state(self):
+        """
+        Write the current state of the sampler to disk.
+
+        The per-iteration run records are stored as contiguous arrays, see
+        `_pack_saved_runs`, and are restored after writing. The likelihood
+        evaluation time is stored so it does not need to be measured again
+        when resuming.
+        """
+        if getattr(self, "sampler", None) is None:
+            return
+        self.sampler.kwargs["log_likelihood_eval_time"] = self._log_likelihood_eval_time
+        original = _pack_saved_runs(self.sampler)
+        try:
+            super(DynamicDynesty, self).write_current_state()
+        finally:
+            for key, value in original.items():
+                setattr(self.sampler, key, value)
+            self.sampler.packed_run_keys = list()
+
+    def read_saved_state(self, continuing=False):
+        """
+        Read the saved state of the sampler from disk, see
+        `Dynesty.read_saved_state`, and convert the run records back to
+        lists. The random state and pool of the internal sampler used to
+        add batches are not pickled, so these are also reset. If the
+        likelihood was not timed, the stored evaluation time is used.
+        """
+        success = super(DynamicDynesty, self).read_saved_state(continuing=continuing)
+        if success:
+            _unpack_saved_runs(self.sampler)
+            eval_time = self.sampler.kwargs.pop("log_likelihood_eval_time", np.nan)
+            if np.isnan(self._log_likelihood_eval_time):
+                self._log_likelihood_eval_time = eval_time
+            internal_sampler = getattr(self.sampler, "sampler", None)
+            if internal_sampler is not None:
+                internal_sampler.rstate = self.sampler.rstate
+                internal_sampler.pool = self.sampler.pool
+                internal_sampler.M = self.sampler.M
+        return success
+
     def write_current_state_and_exit(self, signum=None, frame=None):
+        self._close_pbar()
         Sampler.write_current_state_and_exit(self=self, signum=signum, frame=frame)
 
+    def _close_pbar(self):
+        if getattr(self, "pbar", None) is not None:
+            self.pbar.close()
+
     def _verify_kwargs_against_default_kwargs(self):
+        self._setup_print_func()
         Sampler._verify_kwargs_against_default_kwargs(self)
@@ -27,6 +27,26 @@ def _prior_transform_wrapper(theta):
     )
 
 
+def _prior_transform_wrapper_batch(theta):
+    """
+    Wrapper to the prior transformation for a batch of points with shape
+    `(nbatch, ndim)`. All points are rescaled with a single call to the priors.
+    """
+    from .base_sampler import _sampling_convenience_dump
+
+    rescaled = np.asarray(
+        _sampling_convenience_dump.priors.rescale(
+            _sampling_convenience_dump.search_parameter_keys, theta.T
+        )
+    ).T
+    if rescaled.shape != theta.shape:
+        raise ValueError(
+            f"Batched prior transform returned shape {rescaled.shape}, "
+            f"expected {theta.shape}"
+        )
+    return rescaled
+
+
 def _log_likelihood_wrapper(theta):
     """Wrapper to the log likelihood. Needed for multiprocessing."""
     from .base_sampler import _sampling_convenience_dump
@@ -50,6 +70,36 @@ def _log_likelihood_wrapper(theta):
         return np.nan_to_num(-np.inf)
 
 
+def _log_likelihood_wrapper_batch(theta):
+    """
+    Wrapper to the log likelihood for a batch of points with shape
+    `(nbatch, ndim)`. The likelihood is called once with array-valued
+    parameters and must return an array of length `nbatch`.
+    """
+    from .base_sampler import _sampling_convenience_dump
+
+    params = {
+        key: theta[:, ii]
+        for ii, key in enumerate(_sampling_convenience_dump.search_parameter_keys)
+    }
+    in_prior = np.broadcast_to(
+        _sampling_convenience_dump.priors.evaluate_constraints(params), len(theta)
+    ).astype(bool)
+    _sampling_convenience_dump.likelihood.parameters.update(params)
+    if _sampling_convenience_dump.use_ratio:
+        log_l = _sampling_convenience_dump.likelihood.log_likelihood_ratio()
+    else:
+        log_l = _sampling_convenience_dump.likelihood.log_likelihood()
+    log_l = np.array(log_l, dtype=float)
+    if log_l.shape != (len(theta),):
+        raise ValueError(
+            f"Batched likelihood returned shape {log_l.shape}, "
+            f"expected ({len(theta)},)"
+        )
+    log_l[~in_prior] = np.nan_to_num(-np.inf)
+    return log_l
+
+
 class Dynesty(NestedSampler):
     """
     bilby wrapper of `dynesty.NestedSampler`
@@ -232,10 +282,11 @@ class Dynesty(NestedSampler):
 
     @property
     def sampler_init_kwargs(self):
+        function_kwargs = self.sampler_function_kwargs
         return {
             key: value
             for key, value in self.kwargs.items()
-            if key not in self.sampler_function_kwargs
+            if key not in function_kwargs
         }
 
     def _translate_kwargs(self, kwargs):
@@ -257,33 +308,42 @@ class Dynesty(NestedSampler):
                     kwargs["queue_size"] = kwargs.pop(equiv)
 
     def _verify_kwargs_against_default_kwargs(self):
-        from tqdm.auto import tqdm
-
         if not self.kwargs["walks"]:
             self.kwargs["walks"] = 100
         if not self.kwargs["update_interval"]:
             self.kwargs["update_interval"] = int(0.6 * self.kwargs["nlive"])
+        self._setup_print_func()
+        Sampler._verify_kwargs_against_default_kwargs(self)
+
+    def _setup_print_func(self):
+        """Use `_print_func` if no `print_func` is given, see `print_method`"""
+        from tqdm.auto import tqdm
+
         if self.kwargs["print_func"] is None:
             self.kwargs["print_func"] = self._print_func
             print_method = self.kwargs["print_method"]
             if print_method == "tqdm" and self.kwargs["print_progress"]:
                 self.pbar = tqdm(file=sys.stdout)
+                # The progress bar is updated at most once a second
+                self._last_print_time = datetime.datetime.min
+                self._print_interval = datetime.timedelta(seconds=1)
             elif "interval" in print_method:
                 self._last_print_time = datetime.datetime.now()
                 self._print_interval = datetime.timedelta(
                     seconds=float(print_method.split("-")[1])
                 )
-        Sampler._verify_kwargs_against_default_kwargs(self)
 
     def _print_func(self, results, niter, ncall=None, dlogz=None, *args, **kwargs):
         """Replacing status update for dynesty.result.print_func"""
-        if "interval" in self.kwargs["print_method"]:
+        print_method = self.kwargs["print_method"]
+        if print_method == "tqdm" or "interval" in print_method:
             _time = datetime.datetime.now()
             if _time - self._last_print_time < self._print_interval:
                 return
             else:
                 self._last_print_time = _time
 
+            if "interval" in print_method:
                 # Add time in current run to overall sampling time
                 total_time = self.sampling_time + _time - self.start_time
 
@@ -333,7 +393,12 @@ class Dynesty(NestedSampler):
         string.append(f"ncall:{ncall:.1e}")
         string.append(f"eff:{eff:0.1f}%")
         string.append(f"{key}={logz:0.2f}+/-{logzerr:0.2f}")
-        string.append(f"dlogz:{delta_logz:0.3f}>{dlogz:0.2g}")
+        if dlogz is not None:
+            string.append(f"dlogz:{delta_logz:0.3f}>{dlogz:0.2g}")
+        elif "stop_val" in kwargs:
+            # Batches added by the dynamic sampler report the stopping value
+            string.append(f"batch:{kwargs['nbatch']:d}")
+            string.append(f"stop:{kwargs['stop_val']:0.3f}")
 
         if self.kwargs["print_method"] == "tqdm":
             self.pbar.set_postfix_str(" ".join(string), refresh=False)
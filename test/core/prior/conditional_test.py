@@ -41,6 +41,14 @@ class TestConditionalPrior(unittest.TestCase):
             self.prior.reference_params,
         )
 
+    def test_reference_params_copy(self):
+        other = bilby.core.prior.ConditionalUniform(
+            condition_func=self.condition_func, minimum=self.minimum, maximum=self.maximum
+        )
+        self.prior.reference_params["maximum"] = 10
+        other.reset_to_reference_parameters()
+        self.assertEqual(self.maximum, other.maximum)
+
     def test_required_variables(self):
         self.assertListEqual(
             ["test_variable_1", "test_variable_2"],
@@ -69,6 +77,17 @@ class TestConditionalPrior(unittest.TestCase):
                 continue
             self.assertEqual(value, actual[key])
 
+    def test_reference_params_shared(self):
+        other = bilby.core.prior.ConditionalUniform(
+            condition_func=self.condition_func, minimum=self.minimum, maximum=self.maximum
+        )
+        self.assertIs(self.prior._reference_params, other._reference_params)
+        other = bilby.core.prior.ConditionalUniform(
+            condition_func=self.condition_func, minimum=float(self.minimum), maximum=self.maximum
+        )
+        self.assertIsNot(self.prior._reference_params, other._reference_params)
+        self.assertIsInstance(other.reference_params["minimum"], float)
+
     def test_update_conditions_correct_variables(self):
         self.prior.update_conditions(
             test_variable_1=self.test_variable_1, test_variable_2=self.test_variable_2
@@ -86,6 +105,77 @@ class TestConditionalPrior(unittest.TestCase):
         self.assertEqual(self.minimum + 1, self.prior.minimum)
         self.assertEqual(self.maximum + 1, self.prior.maximum)
 
+    def test_update_conditions_same_variables(self):
+        for _ in range(2):
+            self.prior.update_conditions(
+                test_variable_1=self.test_variable_1,
+                test_variable_2=self.test_variable_2,
+            )
+        self.assertEqual(1, self.condition_func_call_counter)
+        self.prior.update_conditions(
+            test_variable_1=self.test_variable_1 + 1,
+            test_variable_2=self.test_variable_2,
+        )
+        self.assertEqual(2, self.condition_func_call_counter)
+
+    def test_update_conditions_after_reset(self):
+        self.prior.update_conditions(
+            test_variable_1=self.test_variable_1, test_variable_2=self.test_variable_2
+        )
+        self.prior.reset_to_reference_parameters()
+        self.prior.update_conditions(
+            test_variable_1=self.test_variable_1, test_variable_2=self.test_variable_2
+        )
+        self.assertEqual(2, self.condition_func_call_counter)
+        self.assertEqual(self.minimum + 1, self.prior.minimum)
+
+    def test_update_conditions_not_cached_by_default(self):
+        for test_variable_1 in [0, 1, 0]:
+            self.prior.update_conditions(
+                test_variable_1=test_variable_1, test_variable_2=self.test_variable_2
+            )
+        self.assertEqual(3, self.condition_func_call_counter)
+        self.assertEqual(0, len(self.prior._condition_func_cache))
+
+    def test_update_conditions_cached(self):
+        self.prior.condition_func_cache_size = 128
+        for test_variable_1 in [0, 1, 0, 1]:
+            self.prior.update_conditions(
+                test_variable_1=test_variable_1, test_variable_2=self.test_variable_2
+            )
+        self.assertEqual(2, self.condition_func_call_counter)
+        self.assertEqual(self.minimum + 1, self.prior.minimum)
+
+    def test_update_conditions_cache_size(self):
+        self.prior.condition_func_cache_size = 2
+        for test_variable_1 in [0, 1, 2, 0]:
+            self.prior.update_conditions(
+                test_variable_1=test_variable_1, test_variable_2=self.test_variable_2
+            )
+        self.assertEqual(4, self.condition_func_call_counter)
+        self.assertEqual(2, len(self.prior._condition_func_cache))
+
+    def test_update_conditions_same_numpy_scalars(self):
+        for _ in range(2):
+            self.prior.update_conditions(
+                test_variable_1=np.float64(0.5), test_variable_2=np.float64(1)
+            )
+        self.assertEqual(1, self.condition_func_call_counter)
+
+    def test_update_conditions_single_element_arrays(self):
+        self.prior.update_conditions(test_variable_1=0, test_variable_2=1)
+        self.prior.update_conditions(
+            test_variable_1=np.array([0]), test_variable_2=np.array([1])
+        )
+        self.assertEqual(2, self.condition_func_call_counter)
+
+    def test_update_conditions_array_variables(self):
+        for _ in range(2):
+            self.prior.update_conditions(
+                test_variable_1=np.array([0, 1]), test_variable_2=np.array([1, 2])
+            )
+        self.assertEqual(2, self.condition_func_call_counter)
+
     def test_update_conditions_illegal_variables(self):
         with self.assertRaises(bilby.core.prior.IllegalRequiredVariablesException):
             self.prior.update_conditions(test_parameter_1=self.test_variable_1)
@@ -239,6 +329,22 @@ class TestConditionalPriorDict(unittest.TestCase):
             self.conditional_priors_manually_set_items.sorted_keys,
         )
 
+    def test_sorted_keys_cached(self):
+        self.assertIs(
+            self.conditional_priors.sorted_keys, self.conditional_priors.sorted_keys
+        )
+
+    def test_sorted_keys_updated_setting_items(self):
+        self.conditional_priors["var_4"] = bilby.core.prior.Uniform(0, 1)
+        self.assertListEqual(
+            ["var_0", "var_4", "var_1", "var_2", "var_3"],
+            self.conditional_priors.sorted_keys,
+        )
+        del self.conditional_priors["var_4"]
+        self.assertListEqual(
+            ["var_0", "var_1", "var_2", "var_3"], self.conditional_priors.sorted_keys
+        )
+
     def test_unconditional_keys_upon_instantiation(self):
         self.assertListEqual(["var_0"], self.conditional_priors.unconditional_keys)
 
@@ -290,6 +396,23 @@ class TestConditionalPriorDict(unittest.TestCase):
             with self.assertRaises(bilby.core.prior.IllegalConditionsException):
                 self.conditional_priors.sample_subset(keys=["var_1"])
 
+    def test_sample_threaded_matches_sequential(self):
+        self.conditional_priors["var_4"] = bilby.core.prior.Gaussian(0, 1)
+        self.conditional_priors._threaded_sample_size = 10
+        np.random.seed(10)
+        with mock.patch(
+            "bilby.core.prior.dict.ThreadPoolExecutor",
+            wraps=bilby.core.prior.dict.ThreadPoolExecutor,
+        ) as m:
+            threaded = self.conditional_priors.sample(100)
+        self.assertEqual(m.call_count, 1)
+        self.conditional_priors._threaded_sample_size = np.inf
+        np.random.seed(10)
+        sequential = self.conditional_priors.sample(100)
+        self.assertListEqual(list(sequential), list(threaded))
+        for key in sequential:
+            np.testing.assert_array_equal(sequential[key], threaded[key])
+
     def test_sample_multiple(self):
         def condition_func(reference_params, a):
             return dict(
@@ -323,6 +446,70 @@ class TestConditionalPriorDict(unittest.TestCase):
             expected.append(expected[-1] * self.test_sample[f"var_{ii}"])
         self.assertListEqual(expected, res)
 
+    def test_rescale_vectorized_rescale(self):
+        def vectorized_rescale(keys, theta):
+            return list(np.cumprod(theta))
+
+        self.conditional_priors = bilby.core.prior.ConditionalPriorDict(
+            dict(
+                var_3=self.prior_3,
+                var_2=self.prior_2,
+                var_0=self.prior_0,
+                var_1=self.prior_1,
+            ),
+            vectorized_rescale=vectorized_rescale,
+        )
+        keys = list(self.test_sample.keys())
+        theta = list(self.test_sample.values())
+        with mock.patch.object(self.prior_1, "rescale") as m:
+            res = self.conditional_priors.rescale(keys=keys, theta=theta)
+        m.assert_not_called()
+        self.conditional_priors.vectorized_rescale = None
+        expected = self.conditional_priors.rescale(keys=keys, theta=theta)
+        np.testing.assert_allclose(expected, res)
+
+    def test_copy_keeps_vectorized_rescale(self):
+        def vectorized_rescale(keys, theta):
+            return list(theta)
+
+        self.conditional_priors.vectorized_rescale = vectorized_rescale
+        copied = self.conditional_priors.copy()
+        self.assertIs(copied.vectorized_rescale, vectorized_rescale)
+        self.assertEqual(copied, self.conditional_priors)
+
+    def test_rescale_after_setting_item(self):
+        keys = list(self.test_sample.keys())
+        theta = list(self.test_sample.values())
+        self.conditional_priors.rescale(keys=keys, theta=theta)
+        self.conditional_priors["var_0"] = bilby.core.prior.Uniform(0, 2)
+        res = self.conditional_priors.rescale(keys=keys, theta=theta)
+        self.assertEqual(2 * self.test_sample["var_0"], res[0])
+
+    def test_rescale_after_update(self):
+        keys = list(self.test_sample.keys())
+        theta = list(self.test_sample.values())
+        self.conditional_priors.rescale(keys=keys, theta=theta)
+        self.conditional_priors.update(dict(var_0=bilby.core.prior.Uniform(0, 2)))
+        res = self.conditional_priors.rescale(keys=keys, theta=theta)
+        self.assertEqual(2 * self.test_sample["var_0"], res[0])
+
+    def test_rescale_two_dimensional(self):
+        self.conditional_priors = bilby.core.prior.ConditionalPriorDict(
+            dict(
+                var_3=self.prior_3,
+                var_2=self.prior_2,
+                var_0=self.prior_0,
+                var_1=self.prior_1,
+            )
+        )
+        keys = list(self.test_sample.keys())
+        theta = np.random.uniform(0, 1, (len(keys), 5))
+        res = self.conditional_priors.rescale(keys=keys, theta=theta)
+        self.assertEqual(res.shape, theta.shape)
+        for ii in range(theta.shape[1]):
+            expected = self.conditional_priors.rescale(keys=keys, theta=theta[:, ii])
+            np.testing.assert_allclose(res[:, ii], expected)
+
     def test_rescale_with_joint_prior(self):
         """
         Add a joint prior into the conditional prior dictionary and check that
@@ -1,4 +1,354 @@
+import datetime
 import unittest
+from unittest.mock import MagicMock, patch
+
+import numpy as np
+
+import bilby
+from bilby.core.sampler import dynamic_dynesty
+
+
+class TestDynamicDynesty(unittest.TestCase):
+    def setUp(self):
+        self.likelihood = MagicMock()
+        self.priors = bilby.core.prior.PriorDict(
+            dict(a=bilby.core.prior.Uniform(0, 1), b=bilby.core.prior.Uniform(0, 1))
+        )
+        self.sampler = bilby.core.sampler.DynamicDynesty(
+            self.likelihood,
+            self.priors,
+            outdir="outdir",
+            label="label",
+            use_ratio=False,
+            plot=False,
+            skip_import_verification=True,
+        )
+
+    def tearDown(self):
+        del self.likelihood
+        del self.priors
+        del self.sampler
+
+    def test_n_check_point_rounded(self):
+        for eval_time, expected in [(1e-3, 600000), (7, 90), (0.23, 3000), (1e4, 1)]:
+            with patch.object(
+                bilby.core.sampler.DynamicDynesty,
+                "_log_likelihood_eval_time",
+                eval_time,
+                create=True,
+            ), patch.object(bilby.core.sampler.DynamicDynesty, "_time_likelihood"):
+                sampler = bilby.core.sampler.DynamicDynesty(
+                    self.likelihood,
+                    self.priors,
+                    outdir="outdir",
+                    label="label",
+                    plot=False,
+                    skip_import_verification=True,
+                )
+            self.assertEqual(sampler.n_check_point, expected)
+
+    def test_skip_likelihood_timing_on_resume(self):
+        with patch("os.path.isfile", return_value=True), patch.object(
+            bilby.core.sampler.DynamicDynesty, "_time_likelihood"
+        ) as m:
+            sampler = bilby.core.sampler.DynamicDynesty(
+                self.likelihood,
+                self.priors,
+                outdir="outdir",
+                label="label",
+                plot=False,
+                skip_import_verification=True,
+            )
+        m.assert_not_called()
+        self.assertTrue(sampler._skip_likelihood_timing)
+        self.assertIsNone(sampler.n_check_point)
+
+        def read_saved_state(continuing):
+            sampler._log_likelihood_eval_time = 1e-3
+            return True
+
+        with patch.object(sampler, "read_saved_state", side_effect=read_saved_state):
+            self.assertTrue(sampler._maybe_resume())
+        self.assertFalse(sampler._skip_likelihood_timing)
+        self.assertEqual(sampler.n_check_point, 600000)
+
+    def test_cache_disabled_by_default(self):
+        self.assertIs(
+            self.sampler._get_log_likelihood_function(),
+            dynamic_dynesty._log_likelihood_wrapper,
+        )
+
+    def test_cached_log_likelihood(self):
+        self.sampler.kwargs["cache_significant_figures"] = 10
+        with patch.object(
+            dynamic_dynesty, "_log_likelihood_wrapper", return_value=1.0
+        ) as m:
+            func = self.sampler._get_log_likelihood_function()
+            self.assertEqual(func(np.array([0.1, 0.2])), 1.0)
+            self.assertEqual(func(np.array([0.1, 0.2 + 1e-12])), 1.0)
+            self.assertEqual(m.call_count, 1)
+            func(np.array([0.1, 0.3]))
+            self.assertEqual(m.call_count, 2)
+
+    def test_cached_log_likelihood_small_parameters(self):
+        self.sampler.kwargs["cache_significant_figures"] = 10
+        with patch.object(
+            dynamic_dynesty,
+            "_log_likelihood_wrapper",
+            side_effect=lambda theta: float(theta[0] * 1e21),
+        ) as m:
+            func = self.sampler._get_log_likelihood_function()
+            self.assertEqual(func(np.array([3e-21])), 3.0)
+            self.assertAlmostEqual(func(np.array([4e-21])), 4.0)
+            self.assertEqual(func(np.array([3e-21 * (1 + 1e-12)])), 3.0)
+        self.assertEqual(m.call_count, 2)
+        self.assertEqual(m.call_args_list[0][0][0][0], 3e-21)
+
+    def test_cached_log_likelihood_not_shared_between_runs(self):
+        self.sampler.kwargs["cache_significant_figures"] = 10
+        with patch.object(
+            dynamic_dynesty, "_log_likelihood_wrapper", return_value=1.0
+        ) as m:
+            self.sampler._get_log_likelihood_function()(np.array([0.1, 0.2]))
+            # The cache of a persistent pool worker is not cleared
+            with patch.object(self.sampler, "likelihood_cache", dict()):
+                func = self.sampler._get_log_likelihood_function()
+            func(np.array([0.1, 0.2]))
+        self.assertEqual(m.call_count, 2)
+
+    def test_check_point_due(self):
+        self.sampler.n_check_point_flush = 2
+        self.sampler.check_point_delta_t = 0
+        self.sampler._last_checkpoint_time = 0
+        self.sampler._n_pending_checkpoints = 1
+        self.assertFalse(self.sampler._check_point_due())
+        self.sampler._n_pending_checkpoints = 2
+        self.assertTrue(self.sampler._check_point_due())
+        self.sampler.check_point_delta_t = np.inf
+        self.assertFalse(self.sampler._check_point_due())
+
+    def test_check_point_due_n_check_point_given(self):
+        self.sampler._n_check_point_given = True
+        self.sampler.check_point_delta_t = np.inf
+        self.sampler._last_checkpoint_time = 0
+        self.sampler._n_pending_checkpoints = 1
+        self.assertTrue(self.sampler._check_point_due())
+
+    def test_flush_checkpoints(self):
+        self.sampler._n_pending_checkpoints = 2
+        with patch.object(self.sampler, "write_current_state") as m:
+            self.sampler._flush_checkpoints()
+            self.sampler._flush_checkpoints()
+        self.assertEqual(m.call_count, 1)
+        self.assertEqual(self.sampler._n_pending_checkpoints, 0)
+
+    def test_maybe_resume(self):
+        self.sampler.check_point = True
+        self.sampler.resume = True
+        with patch.object(self.sampler, "read_saved_state", return_value=True) as m:
+            self.assertTrue(self.sampler._maybe_resume())
+            m.assert_called_once_with(continuing=True)
+
+    def test_maybe_resume_no_resume(self):
+        self.sampler.resume = False
+        with patch.object(self.sampler, "read_saved_state") as m:
+            self.assertFalse(self.sampler._maybe_resume())
+            m.assert_not_called()
+
+    def test_default_print_func(self):
+        self.assertEqual(self.sampler.kwargs["print_func"], self.sampler._print_func)
+
+    def test_print_func_tqdm_throttled(self):
+        results = (0, None, None, -1.0, np.nan, np.nan, -2.0, 0.01, np.nan, 1, 0, 0, 1, 50.0, np.nan)
+        self.sampler.pbar = MagicMock(n=0)
+        self.sampler._print_func(results, 1, 10, dlogz=0.1)
+        self.sampler._print_func(results, 2, 20, dlogz=0.1)
+        self.sampler.pbar.set_postfix_str.assert_called_once()
+        self.sampler.pbar.update.assert_called_once_with(1)
+
+    def test_print_func_throttled(self):
+        sampler = bilby.core.sampler.DynamicDynesty(
+            self.likelihood,
+            self.priors,
+            outdir="outdir",
+            label="label",
+            skip_import_verification=True,
+            print_method="interval-1000",
+        )
+        sampler.start_time = datetime.datetime.now()
+        sampler._last_print_time -= datetime.timedelta(seconds=1000)
+        results = (0, None, None, -1.0, np.nan, np.nan, -2.0, 0.01, np.nan, 1, 0, 0, 1, 50.0, np.nan)
+        with patch("builtins.print") as m:
+            sampler._print_func(results, 1, 10, nbatch=1, stop_val=2.0)
+            sampler._print_func(results, 2, 20, nbatch=1, stop_val=2.0)
+        m.assert_called_once()
+        self.assertIn("batch:1 stop:2.000", m.call_args[0][0])
+
+    def test_checkpointing_adds_batches(self):
+        sampler = MagicMock(base=False, batch=0, ncall=0, it=1)
+
+        def add_batch(**kwargs):
+            sampler.batch += 1
+            sampler.ncall += 10
+
+        sampler.add_batch.side_effect = add_batch
+        self.sampler.sampler = sampler
+        self.sampler.kwargs["maxbatch"] = 3
+        self.sampler.kwargs["use_stop"] = False
+        with patch.object(self.sampler, "write_current_state"):
+            self.sampler._run_external_sampler_with_checkpointing()
+        self.assertEqual(sampler.run_nested.call_args[1]["maxbatch"], 0)
+        self.assertEqual(sampler.add_batch.call_count, 3)
+        kwargs = sampler.add_batch.call_args[1]
+        self.assertEqual(kwargs["nlive"], self.sampler.kwargs["nlive_batch"])
+        self.assertEqual(kwargs["maxcall"], self.sampler.n_check_point)
+
+    def test_checkpointing_stop_function(self):
+        sampler = MagicMock(base=True, batch=0, ncall=0, it=1)
+        self.sampler.sampler = sampler
+        self.sampler.kwargs["stop_function"] = MagicMock(
+            return_value=(True, (0, 0, 0))
+        )
+        with patch.object(self.sampler, "write_current_state"):
+            self.sampler._run_external_sampler_with_checkpointing()
+        sampler.run_nested.assert_not_called()
+        sampler.add_batch.assert_not_called()
+
+    def test_checkpointing_stop_function_pool(self):
+        for use_pool_stopfn in [True, False]:
+            sampler = MagicMock(
+                base=True, batch=0, ncall=0, it=1, use_pool_stopfn=use_pool_stopfn
+            )
+            self.sampler.sampler = sampler
+            self.sampler.kwargs["stop_function"] = MagicMock(
+                return_value=(True, (0, 0, 0))
+            )
+            with patch.object(self.sampler, "write_current_state"):
+                self.sampler._run_external_sampler_with_checkpointing()
+            expected = sampler.M if use_pool_stopfn else map
+            self.assertIs(
+                self.sampler.kwargs["stop_function"].call_args[1]["M"], expected
+            )
+
+
+class TestBoundDtype(unittest.TestCase):
+    def tearDown(self):
+        dynamic_dynesty._set_bound_dtype(None)
+
+    def test_reduced_precision_bounds_enclose_points(self):
+        from dynesty.bounding import MultiEllipsoid
+
+        original = MultiEllipsoid.update
+        dynamic_dynesty._set_bound_dtype(np.float32)
+        self.assertIsNot(MultiEllipsoid.update, original)
+        points = np.random.uniform(0, 1, (200, 3))
+        bound = MultiEllipsoid(ctrs=[np.full(3, 0.5)], covs=[np.eye(3)])
+        bound.update(points)
+        self.assertEqual(bound.ctrs.dtype, np.float64)
+        self.assertTrue(all(bound.contains(point) for point in points))
+        dynamic_dynesty._set_bound_dtype(None)
+        self.assertIs(MultiEllipsoid.update, original)
+
+    def test_bound_dtype_restored_on_resume_error(self):
+        from dynesty.bounding import MultiEllipsoid
+
+        original = MultiEllipsoid.update
+        likelihood = MagicMock()
+        priors = bilby.core.prior.PriorDict(dict(a=bilby.core.prior.Uniform(0, 1)))
+        sampler = bilby.core.sampler.DynamicDynesty(
+            likelihood,
+            priors,
+            outdir="outdir",
+            label="label",
+            plot=False,
+            skip_import_verification=True,
+            bound_dtype=np.float32,
+        )
+        with patch.object(sampler, "_maybe_resume", side_effect=OSError):
+            with self.assertRaises(OSError):
+                sampler.run_sampler()
+        self.assertIs(MultiEllipsoid.update, original)
+
+
+class TestPackSavedRuns(unittest.TestCase):
+    def setUp(self):
+        self.sampler = MagicMock(spec=[])
+        self.sampler.saved_u = [np.array([0.1, 0.2]), np.array([0.3, 0.4])]
+        self.sampler.saved_logl = [1.0, 2.0]
+        self.sampler.saved_batch_bounds = [(-np.inf, np.inf)]
+        self.sampler.new_u = []
+        self.sampler.live_u = [np.array([0.5, 0.6])]
+
+    def tearDown(self):
+        del self.sampler
+
+    def test_pack_saved_runs(self):
+        original = dynamic_dynesty._pack_saved_runs(self.sampler)
+        self.assertEqual(set(original), {"saved_u", "saved_logl"})
+        self.assertEqual(self.sampler.saved_u.shape, (2, 2))
+        self.assertIsInstance(self.sampler.saved_batch_bounds, list)
+        self.assertIsInstance(self.sampler.live_u, list)
+
+    def test_unpack_saved_runs(self):
+        dynamic_dynesty._pack_saved_runs(self.sampler)
+        dynamic_dynesty._unpack_saved_runs(self.sampler)
+        self.assertIsInstance(self.sampler.saved_u, list)
+        np.testing.assert_array_equal(self.sampler.saved_u[1], [0.3, 0.4])
+        self.assertEqual(self.sampler.saved_logl, [1.0, 2.0])
+        self.assertEqual(self.sampler.packed_run_keys, [])
+
+
+class TestBatchPool(unittest.TestCase):
+    def setUp(self):
+        self.pool = dynamic_dynesty.BatchPool()
+        self.func = MagicMock(side_effect=lambda x: float(np.sum(x)))
+        self.func.name = "loglikelihood"
+        self.points = [np.array([0.1, 0.2]), np.array([0.3, 0.4])]
+
+    def tearDown(self):
+        del self.pool
+        del self.func
+        del self.points
+
+    def test_map_vectorized(self):
+        with patch.object(
+            dynamic_dynesty,
+            "_log_likelihood_wrapper_batch",
+            side_effect=lambda theta: np.sum(theta, axis=1),
+        ) as m:
+            out = self.pool.map(self.func, self.points)
+        self.assertEqual(m.call_count, 1)
+        self.assertEqual(m.call_args[0][0].shape, (2, 2))
+        self.assertEqual(self.func.call_count, 0)
+        np.testing.assert_allclose(out, [0.3, 0.7])
+
+    def test_map_falls_back_to_scalar(self):
+        with patch.object(
+            dynamic_dynesty, "_log_likelihood_wrapper_batch", side_effect=ValueError
+        ):
+            out = list(self.pool.map(self.func, self.points))
+        self.assertFalse(self.pool.vectorized["loglikelihood"])
+        self.assertEqual(self.func.call_count, 2)
+        np.testing.assert_allclose(out, [0.3, 0.7])
+
+    def test_map_other_functions(self):
+        self.func.name = "prior_transform"
+        out = list(self.pool.map(self.func, self.points))
+        self.assertEqual(self.func.call_count, 2)
+        np.testing.assert_allclose(out, [0.3, 0.7])
+
+    def test_map_vectorized_prior_transform(self):
+        self.pool.vectorized["prior_transform"] = True
+        self.func.name = "prior_transform"
+        with patch.object(
+            dynamic_dynesty,
+            "_prior_transform_wrapper_batch",
+            side_effect=lambda theta: 2 * theta,
+        ) as m:
+            out = self.pool.map(self.func, self.points)
+        self.assertEqual(m.call_count, 1)
+        self.assertEqual(self.func.call_count, 0)
+        np.testing.assert_allclose(out, [[0.2, 0.4], [0.6, 0.8]])
 
 
 if __name__ == "__main__":
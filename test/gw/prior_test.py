@@ -37,6 +37,12 @@ class TestBBHPriorDict(unittest.TestCase):
         del self.bbh_prior_dict
         del self.base_directory
 
+    def test_copy(self):
+        copied = self.bbh_prior_dict.copy()
+        self.assertIsInstance(copied, bilby.gw.prior.BBHPriorDict)
+        self.assertEqual(copied, self.bbh_prior_dict)
+        self.assertIsNone(copied.vectorized_rescale)
+
     def test_create_default_prior(self):
         default = bilby.gw.prior.BBHPriorDict()
         minima = all(